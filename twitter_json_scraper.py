@@ -4,13 +4,19 @@ Twitter/X Scraper with JSON input and output.
 Accepts a username and optional search query parameter.
 """
 
-import json
+import asyncio
+import base64
 import time
 import re
+import math
+import hashlib
+import html
 import os
 import random
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -19,20 +25,123 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+import httpx
+import orjson
+from lxml import etree, html as lxml_html
 from webdriver_manager.chrome import ChromeDriverManager
 
-def setup_driver():
+# Precompiled XPath expressions used to pull tweet data out of the timeline DOM
+_TWEET_TEXT_XP = etree.XPath("(.//div[@data-testid='tweetText'])[1]")
+_TIME_XP = etree.XPath(".//time/@datetime")
+_HREF_XP = etree.XPath(".//a[time]/@href")
+_STATS_XP = etree.XPath("(.//div[@role='group'])[1]/div")
+
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'\d+')
+
+# GraphQL endpoints whose responses carry the timeline tweets as JSON
+_GRAPHQL_TIMELINE_RE = re.compile(r'/i/api/graphql/[^/]+/(UserTweets|UserTweetsAndReplies|SearchTimeline)\b')
+
+# User agent shared by the browser and API modes to appear more like a real browser
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+
+# Public bearer token used by X's own web client, used for guest API access
+_API_BEARER_TOKEN = "AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs%3D1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA"
+_API_GUEST_ACTIVATE_URL = "https://api.x.com/1.1/guest/activate.json"
+_API_GRAPHQL_URL = "https://x.com/i/api/graphql"
+
+# GraphQL query IDs rotate when X redeploys its web client. If API mode starts
+# failing with 404s, copy the current IDs from the browser's network tab.
+_API_QUERY_IDS = {
+    'UserByScreenName': 'G3KGOASz96M-Qu0nwmGXNg',
+    'UserTweetsAndReplies': 'E4wA5vo2sjVyvpliUffSCw',
+    'SearchTimeline': 'nK1dw4oV3k4w5TdtcAdSww',
+}
+
+# Feature flags the GraphQL endpoints expect alongside the query variables
+_API_FEATURES = {
+    'hidden_profile_likes_enabled': False,
+    'highlights_tweets_tab_ui_enabled': True,
+    'subscriptions_verification_info_verified_since_enabled': True,
+    'rweb_lists_timeline_redesign_enabled': True,
+    'responsive_web_graphql_exclude_directive_enabled': True,
+    'verified_phone_label_enabled': False,
+    'creator_subscriptions_tweet_preview_api_enabled': True,
+    'responsive_web_graphql_timeline_navigation_enabled': True,
+    'responsive_web_graphql_skip_user_profile_image_extensions_enabled': False,
+    'tweetypie_unmention_optimization_enabled': True,
+    'responsive_web_edit_tweet_api_enabled': True,
+    'graphql_is_translatable_rweb_tweet_is_translatable_enabled': True,
+    'view_counts_everywhere_api_enabled': True,
+    'longform_notetweets_consumption_enabled': True,
+    'tweet_awards_web_tipping_enabled': False,
+    'freedom_of_speech_not_reach_fetch_enabled': True,
+    'standardized_nudges_misinfo': True,
+    'tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled': False,
+    'longform_notetweets_rich_text_read_enabled': True,
+    'longform_notetweets_inline_media_enabled': False,
+    'responsive_web_enhance_cards_enabled': False,
+}
+
+# Maximum number of API requests in flight at once across all targets
+_API_MAX_CONCURRENT_REQUESTS = 10
+
+@dataclass(slots=True)
+class Tweet:
+    """A single scraped tweet. Serialized field by field, in this order, to the output."""
+    tweet_id: str
+    timestamp: str
+    text: str
+    replies: int
+    retweets: int
+    likes: int
+    url: str
+
+class BloomFilter:
+    """Fixed-size Bloom filter used for constant-memory duplicate detection."""
+    
+    def __init__(self, capacity, error_rate=1e-6):
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, item):
+        # Double hashing: derive all bit positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+def setup_driver(headless=False):
     """Setup and return a Chrome WebDriver instance with appropriate options."""
     chrome_options = Options()
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--disable-notifications")
     chrome_options.add_argument("--disable-infobars")
     chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    
+    # Don't wait for every subresource, and skip images entirely; we only need the tweets
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    
+    # Record network events so timeline GraphQL responses can be read directly
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     
     # Add user agent to appear more like a real browser
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
+    chrome_options.add_argument(f"--user-agent={_USER_AGENT}")
     
     try:
         # First approach - Use webdriver manager
@@ -70,7 +179,7 @@ def check_for_login_wall(driver):
 
 def clean_tweet_text(text):
     """Clean the tweet text by removing extra spaces and newlines."""
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def random_scroll(driver):
@@ -78,59 +187,217 @@ def random_scroll(driver):
     scroll_height = random.randint(300, 1000)
     driver.execute_script(f"window.scrollBy(0, {scroll_height});")
 
-def extract_tweet_data(article, username):
-    """Extract data from a tweet article element."""
+def extract_tweet_data(article, url_prefix):
+    """Extract a Tweet from a tweet article element (an lxml Element).
+    
+    url_prefix is the tweet URL up to and including "/status/".
+    """
     try:
         # Extract timestamp
-        time_element = article.find('time')
-        timestamp = time_element['datetime'] if time_element else "Unknown"
+        timestamps = _TIME_XP(article)
+        timestamp = timestamps[0] if timestamps else "Unknown"
         
         # Extract tweet URL/ID
-        if time_element and time_element.parent and time_element.parent.parent:
-            tweet_link = time_element.parent.parent.get('href')
-            tweet_id = tweet_link.split('/')[-1] if tweet_link else "Unknown"
+        tweet_links = _HREF_XP(article)
+        if tweet_links:
+            tweet_id = tweet_links[0].split('/')[-1]
+            tweet_url = url_prefix + tweet_id
         else:
             tweet_id = "Unknown"
+            tweet_url = ""
         
         # Extract tweet text
-        tweet_text_div = article.find('div', {'data-testid': 'tweetText'})
-        if tweet_text_div:
-            tweet_text = clean_tweet_text(tweet_text_div.get_text())
+        tweet_text_divs = _TWEET_TEXT_XP(article)
+        if tweet_text_divs:
+            tweet_text = clean_tweet_text(''.join(tweet_text_divs[0].itertext()))
         else:
             tweet_text = "No text found"
         
         # Extract likes, retweets, replies
-        stats_divs = article.find_all('div', {'role': 'group'})
+        stats_elements = _STATS_XP(article)
         stats = {}
-        if stats_divs:
-            stats_elements = stats_divs[0].find_all('div')
-            for i, stat_type in enumerate(['replies', 'retweets', 'likes']):
-                if i < len(stats_elements):
-                    stat_text = stats_elements[i].get_text()
-                    stat_value = re.search(r'\d+', stat_text)
-                    stats[stat_type] = int(stat_value.group()) if stat_value else 0
-        
-        # Add tweet to our list
-        tweet_data = {
-            'tweet_id': tweet_id,
-            'timestamp': timestamp,
-            'text': tweet_text,
-            'replies': stats.get('replies', 0),
-            'retweets': stats.get('retweets', 0),
-            'likes': stats.get('likes', 0),
-            'url': f"https://twitter.com/{username}/status/{tweet_id}" if tweet_id != "Unknown" else "Unknown"
-        }
+        for i, stat_type in enumerate(['replies', 'retweets', 'likes']):
+            if i < len(stats_elements):
+                stat_text = stats_elements[i].text_content()
+                stat_value = _NUM_RE.search(stat_text)
+                stats[stat_type] = int(stat_value.group()) if stat_value else 0
         
-        return tweet_data
+        return Tweet(
+            tweet_id=tweet_id,
+            timestamp=timestamp,
+            text=tweet_text,
+            replies=stats.get('replies', 0),
+            retweets=stats.get('retweets', 0),
+            likes=stats.get('likes', 0),
+            url=tweet_url
+        )
     except Exception as e:
         print(f"Error extracting tweet data: {e}")
         return None
 
-def scrape_tweets(driver, username, search_query=None, max_scrolls=200, scroll_pause_time=2.5, scroll_variation=1.0):
-    """Scrape tweets by scrolling through the timeline."""
+def iter_graphql_tweet_results(node):
+    """Yield every tweet result object nested anywhere in a GraphQL timeline response."""
+    if isinstance(node, dict):
+        tweet_results = node.get('tweet_results')
+        if isinstance(tweet_results, dict) and 'result' in tweet_results:
+            result = tweet_results['result']
+            # Tweets with visibility restrictions wrap the real tweet one level deeper
+            if result.get('__typename') == 'TweetWithVisibilityResults':
+                result = result.get('tweet', {})
+            yield result
+            return
+        for value in node.values():
+            yield from iter_graphql_tweet_results(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from iter_graphql_tweet_results(value)
+
+def graphql_result_to_tweet_data(result, url_prefix):
+    """Convert a GraphQL tweet result object into a Tweet."""
+    legacy = result.get('legacy')
+    if not legacy:
+        return None
+    
+    tweet_id = legacy.get('id_str') or result.get('rest_id')
+    if not tweet_id:
+        return None
+    
+    # X sends the text HTML-escaped, with leading reply @mentions and a trailing
+    # media link outside display_text_range. Trim those so the text matches
+    # what the DOM path reads from the tweetText div. The range indexes the
+    # unescaped text, so unescape before slicing.
+    start, end = legacy.get('display_text_range') or (0, None)
+    note_tweet = result.get('note_tweet', {}).get('note_tweet_results', {}).get('result', {})
+    if note_tweet.get('text'):
+        # Long tweets keep their full text in note_tweet; only the reply prefix applies
+        tweet_text = html.unescape(note_tweet['text'])[start:]
+    else:
+        tweet_text = html.unescape(legacy.get('full_text', ''))[start:end]
+    tweet_text = clean_tweet_text(tweet_text) or "No text found"
+    
+    # Match the ISO format of the <time datetime> attribute used by the DOM path
+    try:
+        created_at = datetime.strptime(legacy['created_at'], '%a %b %d %H:%M:%S %z %Y')
+        timestamp = created_at.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    except (KeyError, ValueError):
+        timestamp = "Unknown"
+    
+    return Tweet(
+        tweet_id=tweet_id,
+        timestamp=timestamp,
+        text=tweet_text,
+        replies=legacy.get('reply_count', 0),
+        retweets=legacy.get('retweet_count', 0),
+        likes=legacy.get('favorite_count', 0),
+        url=url_prefix + tweet_id
+    )
+
+def collect_graphql_tweets(driver, url_prefix, pending_requests):
+    """Read tweets from timeline GraphQL responses captured in the performance log.
+    
+    pending_requests maps request IDs to whether they have finished loading. It
+    is carried across calls so responses still loading on a previous call are
+    read once Chrome reports them finished.
+    """
+    try:
+        log_entries = driver.get_log('performance')
+    except WebDriverException:
+        # Performance logging isn't available (e.g. unsupported driver)
+        return []
+    
+    for entry in log_entries:
+        message = orjson.loads(entry['message']).get('message', {})
+        method = message.get('method')
+        params = message.get('params', {})
+        request_id = params.get('requestId')
+        if method == 'Network.responseReceived':
+            if _GRAPHQL_TIMELINE_RE.search(params.get('response', {}).get('url', '')):
+                pending_requests.setdefault(request_id, False)
+        elif method == 'Network.loadingFinished' and request_id in pending_requests:
+            pending_requests[request_id] = True
+        elif method == 'Network.loadingFailed':
+            pending_requests.pop(request_id, None)
+    
     tweets = []
+    for request_id, finished in list(pending_requests.items()):
+        if not finished:
+            continue
+        # The body is only read once; if Chrome has already evicted it, give up on it
+        del pending_requests[request_id]
+        try:
+            response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            continue
+        
+        body = response.get('body', '')
+        if response.get('base64Encoded'):
+            body = base64.b64decode(body)
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            continue
+        
+        for result in iter_graphql_tweet_results(data):
+            tweet_data = graphql_result_to_tweet_data(result, url_prefix)
+            if tweet_data:
+                tweets.append(tweet_data)
+    
+    return tweets
+
+def collect_new_articles(driver, seen_ids, seen_labels):
+    """Collect the outerHTML of tweet articles in the live DOM whose IDs haven't been seen yet.
+    
+    seen_labels records the aria-labelledby value of every article collected so
+    far, which lets later calls skip them with a single attribute read.
+    """
+    articles = []
+    for element in driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]'):
+        try:
+            # Shallow attribute check first; it's cheaper than looking up the tweet ID
+            label = element.get_attribute('aria-labelledby')
+            if label and label in seen_labels:
+                continue
+            
+            # Cheap ID lookup so we can skip known tweets before serializing them
+            try:
+                tweet_link = element.find_element(By.XPATH, './/a[time]').get_attribute('href')
+            except NoSuchElementException:
+                tweet_link = None
+            if tweet_link and tweet_link.split('/')[-1] in seen_ids:
+                continue
+            
+            articles.append(element.get_attribute('outerHTML'))
+            if label:
+                seen_labels.add(label)
+        except StaleElementReferenceException:
+            # X virtualizes the timeline, so articles can vanish while we iterate
+            continue
+    
+    return articles
+
+def parse_articles(article_htmls, url_prefix):
+    """Parse article HTML fragments and extract tweet data.
+    
+    Runs on a worker thread, so it only touches its arguments and never the driver.
+    """
+    parsed_tweets = []
+    for article_html in article_htmls:
+        article = lxml_html.fromstring(article_html)
+        tweet_data = extract_tweet_data(article, url_prefix)
+        if tweet_data:
+            parsed_tweets.append(tweet_data)
+    
+    return parsed_tweets
+
+def scrape_tweets(driver, writer, username, search_query=None, max_scrolls=200, scroll_pause_time=2.5):
+    """Scrape tweets by scrolling through the timeline, streaming each new tweet to writer.
+    
+    Returns the number of tweets written.
+    """
+    tweet_count = 0
     unique_tweet_ids = set()  # To check for duplicates based on ID
-    unique_tweet_texts = set()  # Fallback for duplicate detection
+    # Fallback for duplicate detection, sized for roughly 20 new tweets per scroll
+    text_bloom = BloomFilter(capacity=max(max_scrolls * 20, 1000))
     scroll_count = 0
     consecutive_no_new_tweets = 0
     
@@ -143,6 +410,15 @@ def scrape_tweets(driver, username, search_query=None, max_scrolls=200, scroll_p
         # For all user's tweets and replies
         target_url = f"https://x.com/{username}/with_replies"
     
+    # Built once so each tweet's URL is a single concatenation
+    url_prefix = f"https://twitter.com/{username}/status/"
+    
+    # Discard network events left over from a previous scrape with this driver
+    try:
+        driver.get_log('performance')
+    except WebDriverException:
+        pass
+    
     print(f"Starting to scrape tweets from {target_url}")
     driver.get(target_url)
     
@@ -157,96 +433,313 @@ def scrape_tweets(driver, username, search_query=None, max_scrolls=200, scroll_p
         )
     except TimeoutException:
         print("Timeout while waiting for the timeline to load.")
-        return tweets
+        return tweet_count
     
-    time.sleep(3)  # Allow some time for the page to fully load
+    # Give the rest of the first batch a moment to render
+    try:
+        WebDriverWait(driver, 10).until(
+            lambda d: len(d.find_elements(By.CSS_SELECTOR, 'article')) >= 2
+        )
+    except TimeoutException:
+        pass
     
-    # Scroll and scrape
-    while scroll_count < max_scrolls:
-        # Every 10 scrolls, perform some random actions to appear more human-like
-        if scroll_count % 10 == 0:
-            random_scroll(driver)
-            time.sleep(random.uniform(1.0, 3.0))
-        
-        # Parse the page with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Find all tweet articles
-        articles = soup.find_all('article')
-        
-        new_tweets_found = 0
-        
-        for article in articles:
-            tweet_data = extract_tweet_data(article, username)
-            
-            if not tweet_data:
-                continue
-                
+    def add_new_tweets(batch):
+        """Write the unseen tweets from a batch to the output and return how many were added."""
+        nonlocal tweet_count
+        added = 0
+        for tweet_data in batch:
             # Check if we've already seen this tweet
-            if tweet_data['tweet_id'] != "Unknown" and tweet_data['tweet_id'] in unique_tweet_ids:
+            if tweet_data.tweet_id != "Unknown" and tweet_data.tweet_id in unique_tweet_ids:
                 continue
                 
             # Fallback check for duplicates based on content
-            if tweet_data['text'] in unique_tweet_texts:
+            if tweet_data.text in text_bloom:
                 continue
                 
             # Add the tweet to our results
-            tweets.append(tweet_data)
-            new_tweets_found += 1
+            writer.write(tweet_data)
+            added += 1
             
             # Record the ID and text to avoid duplicates
-            if tweet_data['tweet_id'] != "Unknown":
-                unique_tweet_ids.add(tweet_data['tweet_id'])
-            unique_tweet_texts.add(tweet_data['text'])
+            if tweet_data.tweet_id != "Unknown":
+                unique_tweet_ids.add(tweet_data.tweet_id)
+            text_bloom.add(tweet_data.text)
+        tweet_count += added
+        return added
+    
+    # Tweets are read from intercepted GraphQL responses when possible. If none
+    # have been captured, fall back to parsing the DOM on a worker thread while
+    # the main thread scrolls and waits for the next batch to load.
+    pending_requests = {}
+    seen_article_labels = set()
+    use_graphql = False
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        while scroll_count < max_scrolls:
+            # Every 10 scrolls, perform some random actions to appear more human-like
+            if scroll_count % 10 == 0:
+                random_scroll(driver)
+                time.sleep(random.uniform(1.0, 3.0))
             
-        # Scroll down to load more tweets
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(scroll_pause_time + random.uniform(-scroll_variation, scroll_variation))
-        scroll_count += 1
-        
-        # If we didn't find any new tweets, increment the counter
-        if new_tweets_found == 0:
-            consecutive_no_new_tweets += 1
-        else:
-            consecutive_no_new_tweets = 0
+            batch = collect_graphql_tweets(driver, url_prefix, pending_requests)
+            use_graphql = use_graphql or bool(batch)
             
-        # If we've gone 5 scrolls without finding new tweets, stop
-        if consecutive_no_new_tweets >= 5:
-            print(f"No new tweets found in the last 5 scrolls. Stopping.")
-            break
+            parse_future = None
+            if not use_graphql:
+                # Grab only the newly loaded tweet articles and hand them off for parsing
+                article_htmls = collect_new_articles(driver, unique_tweet_ids, seen_article_labels)
+                parse_future = pool.submit(parse_articles, article_htmls, url_prefix)
             
-        # Print progress
-        if scroll_count % 10 == 0:
-            print(f"Scrolled {scroll_count} times, found {len(tweets)} tweets so far")
+            # Scroll down and wait for more tweets to load, i.e. for the page to grow.
+            # A stalled page times out here and is caught by the no-new-tweets check.
+            previous_height = driver.execute_script("return document.body.scrollHeight")
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, scroll_pause_time * 2).until(
+                    lambda d: d.execute_script("return document.body.scrollHeight") > previous_height
+                )
+            except TimeoutException:
+                pass
+            scroll_count += 1
             
-    print(f"Scraping complete. Found {len(tweets)} unique tweets.")
-    return tweets
+            if parse_future:
+                batch = parse_future.result()
+            new_tweets_found = add_new_tweets(batch)
+            
+            # If we didn't find any new tweets, increment the counter
+            if new_tweets_found == 0:
+                consecutive_no_new_tweets += 1
+            else:
+                consecutive_no_new_tweets = 0
+                
+            # If we've gone 5 scrolls without finding new tweets, stop
+            if consecutive_no_new_tweets >= 5:
+                print(f"No new tweets found in the last 5 scrolls. Stopping.")
+                break
+                
+            # Print progress
+            if scroll_count % 10 == 0:
+                print(f"Scrolled {scroll_count} times, found {tweet_count} tweets so far")
+    
+    # Pick up any responses that arrived after the last scroll
+    if use_graphql:
+        add_new_tweets(collect_graphql_tweets(driver, url_prefix, pending_requests))
+            
+    print(f"Scraping complete. Found {tweet_count} unique tweets.")
+    return tweet_count
 
-def save_tweets_to_json(tweets, filename):
-    """Save tweet data to a JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(tweets, f, indent=2, ensure_ascii=False)
-    print(f"Saved {len(tweets)} tweets to {filename}")
+class TweetStreamWriter:
+    """Write tweets to a file as they are scraped, either as a JSON array or as NDJSON."""
+    
+    FLUSH_EVERY = 50
+    
+    def __init__(self, filename, output_format='json'):
+        self.filename = filename
+        self.output_format = output_format
+        self.count = 0
+        # orjson produces UTF-8 bytes, so write them without re-encoding
+        self.file = open(filename, 'wb')
+        if output_format == 'json':
+            self.file.write(b'[')
+    
+    def write(self, tweet_data):
+        if self.output_format == 'json':
+            # Indent each record to match a 2-space indented array of tweets
+            record = orjson.dumps(tweet_data, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  ')
+            self.file.write((b'\n  ' if self.count == 0 else b',\n  ') + record)
+        else:
+            self.file.write(orjson.dumps(tweet_data) + b'\n')
+        
+        self.count += 1
+        if self.count % self.FLUSH_EVERY == 0:
+            self.file.flush()
+    
+    def close(self):
+        if self.output_format == 'json':
+            self.file.write(b'\n]' if self.count else b']')
+        self.file.close()
+        print(f"Saved {self.count} tweets to {self.filename}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def find_bottom_cursor(node):
+    """Return the pagination cursor for the next page of a GraphQL timeline response."""
+    if isinstance(node, dict):
+        if node.get('cursorType') == 'Bottom':
+            return node.get('value')
+        values = node.values()
+    elif isinstance(node, list):
+        values = node
+    else:
+        return None
+    
+    for value in values:
+        cursor = find_bottom_cursor(value)
+        if cursor:
+            return cursor
+    return None
+
+async def fetch_guest_token(client):
+    """Activate and return a guest token for unauthenticated API access."""
+    response = await client.post(_API_GUEST_ACTIVATE_URL)
+    response.raise_for_status()
+    return orjson.loads(response.content)['guest_token']
+
+async def graphql_request(client, semaphore, operation, variables):
+    """Call a GraphQL operation and return the decoded JSON response."""
+    params = {
+        'variables': orjson.dumps(variables).decode('utf-8'),
+        'features': orjson.dumps(_API_FEATURES).decode('utf-8'),
+    }
+    async with semaphore:
+        response = await client.get(f"{_API_GRAPHQL_URL}/{_API_QUERY_IDS[operation]}/{operation}", params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def scrape_tweets_api(client, semaphore, writer, username, search_query=None, max_pages=200):
+    """Scrape tweets by paging through the GraphQL timeline API, streaming each new tweet to writer.
+    
+    Returns the number of tweets written.
+    """
+    tweet_count = 0
+    unique_tweet_ids = set()
+    url_prefix = f"https://twitter.com/{username}/status/"
+    
+    # Use the same timelines as the browser: search results or tweets and replies
+    if search_query:
+        operation = 'SearchTimeline'
+        variables = {
+            'rawQuery': f"from:{username} {search_query}",
+            'count': 40,
+            'querySource': 'typed_query',
+            'product': 'Top',
+        }
+    else:
+        user_data = await graphql_request(client, semaphore, 'UserByScreenName', {'screen_name': username})
+        try:
+            user_id = user_data['data']['user']['result']['rest_id']
+        except (KeyError, TypeError):
+            print(f"Could not find user {username}")
+            return tweet_count
+        operation = 'UserTweetsAndReplies'
+        variables = {
+            'userId': user_id,
+            'count': 40,
+            'includePromotedContent': False,
+            'withCommunity': True,
+            'withVoice': True,
+        }
+    
+    print(f"Starting to scrape tweets via the {operation} API for {username}")
+    
+    # Each page's cursor comes from the previous response, so pages are fetched in order
+    for page in range(max_pages):
+        data = await graphql_request(client, semaphore, operation, variables)
+        
+        new_tweets_found = 0
+        for result in iter_graphql_tweet_results(data):
+            tweet_data = graphql_result_to_tweet_data(result, url_prefix)
+            if not tweet_data or tweet_data.tweet_id in unique_tweet_ids:
+                continue
+            writer.write(tweet_data)
+            unique_tweet_ids.add(tweet_data.tweet_id)
+            new_tweets_found += 1
+        tweet_count += new_tweets_found
+        
+        cursor = find_bottom_cursor(data)
+        if new_tweets_found == 0 or not cursor:
+            break
+        variables['cursor'] = cursor
+        
+        if (page + 1) % 10 == 0:
+            print(f"Fetched {page + 1} pages for {username}, found {tweet_count} tweets so far")
+    
+    print(f"Scraping complete for {username}. Found {tweet_count} unique tweets.")
+    return tweet_count
+
+async def scrape_targets_api(targets, output_format='json', max_pages=200):
+    """Scrape every target concurrently over HTTP/2 using a guest token, without a browser."""
+    headers = {
+        'authorization': f"Bearer {_API_BEARER_TOKEN}",
+        'content-type': 'application/json',
+        'x-twitter-active-user': 'yes',
+        'x-twitter-client-language': 'en',
+        'user-agent': _USER_AGENT,
+    }
+    semaphore = asyncio.Semaphore(_API_MAX_CONCURRENT_REQUESTS)
+    
+    async with httpx.AsyncClient(http2=True, headers=headers, timeout=30.0) as client:
+        try:
+            client.headers['x-guest-token'] = await fetch_guest_token(client)
+        except (httpx.HTTPError, orjson.JSONDecodeError, KeyError) as e:
+            print(f"Failed to obtain a guest token: {e}")
+            sys.exit(1)
+        
+        async def scrape_target(target):
+            username = target['username']
+            search_query = target['search_query']
+            output_file = build_output_filename(username, search_query, output_format)
+            with TweetStreamWriter(output_file, output_format) as writer:
+                try:
+                    await scrape_tweets_api(client, semaphore, writer, username, search_query, max_pages)
+                except (httpx.HTTPError, orjson.JSONDecodeError, KeyError) as e:
+                    # A non-JSON body (e.g. an HTML interstitial) or an unexpected shape
+                    # only fails this target, not the others running alongside it
+                    print(f"Error scraping {username} via the API: {e}")
+        
+        await asyncio.gather(*(scrape_target(target) for target in targets))
+
+def build_output_filename(username, search_query, output_format):
+    """Build a timestamped output filename for a scrape target."""
+    if search_query:
+        return f"{username}_{search_query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+    return f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+
+def _is_number(value):
+    """Return True for JSON numbers (bools are excluded even though they subclass int)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
 def process_json_input(json_input):
-    """Process the JSON input data."""
+    """Process the JSON input data.
+    
+    username and search_query may each be a single string or a list of strings;
+    every username is scraped with every search query.
+    """
     try:
-        data = json.loads(json_input)
-        username = data.get('username')
-        search_query = data.get('search_query', None)
+        data = orjson.loads(json_input)
+        usernames = data.get('username')
+        search_queries = data.get('search_query', None)
         max_scrolls = data.get('max_scrolls', 200)
         scroll_pause_time = data.get('scroll_pause_time', 2.5)
+        headless = data.get('headless', False)
         
-        if not username:
+        if not isinstance(usernames, list):
+            usernames = [usernames]
+        # Numeric usernames (e.g. an unquoted 12345) are accepted as strings
+        usernames = [str(username) if _is_number(username) else username for username in usernames]
+        if not usernames or not all(isinstance(username, str) and username for username in usernames):
             raise ValueError("Username is required in the JSON input")
+        
+        if not isinstance(search_queries, list):
+            search_queries = [search_queries]
+        search_queries = [str(query) if _is_number(query) else query for query in search_queries]
+        if not search_queries or not all(query is None or isinstance(query, str) for query in search_queries):
+            raise ValueError("search_query must be a string or a list of strings")
             
         return {
-            'username': username,
-            'search_query': search_query,
+            'targets': [
+                {'username': username, 'search_query': search_query}
+                for username in usernames
+                for search_query in search_queries
+            ],
             'max_scrolls': max_scrolls,
-            'scroll_pause_time': scroll_pause_time
+            'scroll_pause_time': scroll_pause_time,
+            'headless': headless
         }
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise ValueError("Invalid JSON format")
 
 def main():
@@ -254,6 +747,10 @@ def main():
     parser = argparse.ArgumentParser(description='Twitter/X Scraper with JSON input')
     parser.add_argument('--json', type=str, help='JSON string with configuration')
     parser.add_argument('--json-file', type=str, help='Path to JSON file with configuration')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help='Output format: a JSON array or one JSON object per line (default: json)')
+    parser.add_argument('--mode', choices=['selenium', 'api'], default='selenium',
+                        help='Scrape through a Chrome browser or directly through the X API with a guest token (default: selenium)')
     args = parser.parse_args()
     
     # Process JSON input
@@ -269,28 +766,37 @@ def main():
         config = process_json_input(json_input)
     
     # Initialize the scraper
-    username = config['username']
-    search_query = config['search_query']
     max_scrolls = config['max_scrolls']
     scroll_pause_time = config['scroll_pause_time']
-    scroll_variation = 1.0  # Random variation in scroll time
     
-    output_file = f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    if search_query:
-        output_file = f"{username}_{search_query}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # API mode talks to X's GraphQL endpoints directly; max_scrolls caps the pages fetched
+    if args.mode == 'api':
+        asyncio.run(scrape_targets_api(config['targets'], args.format, max_scrolls))
+        return
     
-    # Setup driver and scrape tweets
-    driver = setup_driver()
+    # Setup one driver and reuse it for every target to avoid repeated Chrome startups
+    driver = setup_driver(headless=config['headless'])
     try:
-        tweets = scrape_tweets(
-            driver, 
-            username, 
-            search_query, 
-            max_scrolls, 
-            scroll_pause_time,
-            scroll_variation
-        )
-        save_tweets_to_json(tweets, output_file)
+        for target in config['targets']:
+            username = target['username']
+            search_query = target['search_query']
+            
+            output_file = build_output_filename(username, search_query, args.format)
+            
+            # Tweets are written as they're found, so progress survives a crash
+            with TweetStreamWriter(output_file, args.format) as writer:
+                try:
+                    scrape_tweets(
+                        driver, 
+                        writer,
+                        username, 
+                        search_query, 
+                        max_scrolls, 
+                        scroll_pause_time
+                    )
+                except Exception as e:
+                    # One failed target shouldn't abandon the rest of the batch
+                    print(f"Error scraping {username}: {e}")
     finally:
         driver.quit()
 
@@ -12,7 +12,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 from webdriver_manager.chrome import ChromeDriverManager
 import sys
 
@@ -29,6 +29,9 @@ AUTO_LOGIN = False  # Set to True if you want to use automatic login
 # TWITTER_EMAIL = "your_email@example.com"
 # TWITTER_PASSWORD = "your_password"
 
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'\d+')
+
 def setup_driver():
     """Setup and return a Chrome WebDriver instance with appropriate options."""
     chrome_options = Options()
@@ -134,7 +137,7 @@ def login_to_twitter(driver):
 
 def clean_tweet_text(text):
     """Clean the tweet text by removing extra spaces and newlines."""
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def check_for_login_wall(driver):
@@ -179,14 +182,15 @@ def extract_tweet_data(article, username=None):
             tweet_text = "No text found"
         
         # Extract likes, retweets, replies
-        stats_divs = article.find_all('div', {'role': 'group'})
+        stats_div = article.find('div', {'role': 'group'})
         stats = {}
-        if stats_divs:
-            stats_elements = stats_divs[0].find_all('div')
+        if stats_div:
+            # The stat buttons are direct children of the role=group div
+            stats_elements = stats_div.find_all('div', recursive=False)
             for i, stat_type in enumerate(['replies', 'retweets', 'likes']):
                 if i < len(stats_elements):
                     stat_text = stats_elements[i].get_text()
-                    stat_value = re.search(r'\d+', stat_text)
+                    stat_value = _NUM_RE.search(stat_text)
                     stats[stat_type] = int(stat_value.group()) if stat_value else 0
         
         # Use provided username or global variable
@@ -244,8 +248,12 @@ def scrape_tweets(driver, username=None):
             random_scroll(driver)
             time.sleep(random.uniform(1.0, 3.0))
         
-        # Parse the page with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Parse the page with BeautifulSoup (lxml is much faster on X's large DOM)
+        page_source = driver.page_source
+        try:
+            soup = BeautifulSoup(page_source, 'lxml')
+        except FeatureNotFound:
+            soup = BeautifulSoup(page_source, 'html.parser')
         
         # Find all tweet articles
         tweet_articles = soup.find_all('article')
@@ -17,7 +17,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 
 # Configuration
 TWITTER_USERNAME = "example_user"  # Default placeholder - will be overridden by command line args
@@ -32,6 +32,10 @@ AUTO_LOGIN = False  # Set to True if you want to use automatic login
 TWITTER_EMAIL = None
 TWITTER_PASSWORD = None
 
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'\d+')
+_STATUS_ID_RE = re.compile(r'/status/(\d+)')
+
 def setup_driver():
     """Setup and return an Undetected ChromeDriver instance."""
     print("Initializing undetected ChromeDriver...")
@@ -92,7 +96,7 @@ def login_to_twitter(driver):
 
 def clean_tweet_text(text):
     """Clean the tweet text by removing extra spaces and newlines."""
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def check_for_login_wall(driver):
@@ -148,7 +152,7 @@ def extract_tweet_data(article, username):
         # Extract tweet ID from the link
         if tweet_link:
             # Look for /status/123456789 pattern
-            match = re.search(r'/status/(\d+)', tweet_link)
+            match = _STATUS_ID_RE.search(tweet_link)
             if match:
                 tweet_id = match.group(1)
         
@@ -175,13 +179,14 @@ def extract_tweet_data(article, username):
         stats = {'replies': 0, 'retweets': 0, 'likes': 0}
         
         # Try multiple approaches for stats
-        stats_divs = article.find_all('div', {'role': 'group'})
-        if stats_divs:
-            stats_elements = stats_divs[0].find_all('div')
+        stats_div = article.find('div', {'role': 'group'})
+        if stats_div:
+            # The stat buttons are direct children of the role=group div
+            stats_elements = stats_div.find_all('div', recursive=False)
             for i, stat_type in enumerate(['replies', 'retweets', 'likes']):
                 if i < len(stats_elements):
                     stat_text = stats_elements[i].get_text()
-                    stat_value = re.search(r'\d+', stat_text)
+                    stat_value = _NUM_RE.search(stat_text)
                     stats[stat_type] = int(stat_value.group()) if stat_value else 0
         
         # Alternative approach - look for the specific aria-labels
@@ -196,7 +201,7 @@ def extract_tweet_data(article, username):
             if elements:
                 for el in elements:
                     label = el.get('aria-label', '')
-                    match = re.search(r'\d+', label)
+                    match = _NUM_RE.search(label)
                     if match:
                         stats[stat_type] = int(match.group())
                         break
@@ -379,8 +384,12 @@ def scrape_tweets(driver, username):
                     print(f"JS method found {new_tweets} new tweets")
                     consecutive_no_new_tweets = 0
         
-        # Parse the page with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Parse the page with BeautifulSoup (lxml is much faster on X's large DOM)
+        page_source = driver.page_source
+        try:
+            soup = BeautifulSoup(page_source, 'lxml')
+        except FeatureNotFound:
+            soup = BeautifulSoup(page_source, 'html.parser')
         
         # Find all tweet articles - use a more specific selector that targets tweets
         tweet_articles = soup.find_all('article')